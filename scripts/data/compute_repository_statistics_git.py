@@ -79,7 +79,9 @@ def check_repositories_statistics(repositories_info_path, dataset_directory_path
         repo = GitRepo(repository_path)
 
         try:
-            commit_number = repo.count_commits()
+            # single walk over history from HEAD, instead of separate
+            # count_commits() and find_roots()
+            repo_summary = repo.collect_repo_summary()
         except subprocess.CalledProcessError as err:
             # this means that repository is empty
             tqdm.write(f"WARNING: {repo_name} seems to have been empty when cloning\n"
@@ -91,6 +93,7 @@ def check_repositories_statistics(repositories_info_path, dataset_directory_path
                     tqdm.write(f"{err.stderr}-----")
             continue
 
+        commit_number = repo_summary.count
         commit_number_first_parent = repo.count_commits(first_parent=True)
         authors_list = repo.list_authors_shortlog()
         author_number = len(authors_list)
@@ -98,11 +101,11 @@ def check_repositories_statistics(repositories_info_path, dataset_directory_path
             parse_shortlog_count(authors_list), perc=0.8)
         core_author_lumber = len(core_authors_list)
         files_number = len(repo.list_files())
-        root_commits = repo.find_roots()
+        root_commits = repo_summary.roots
         HEAD_commit_timestamp = repo.get_commit_metadata('HEAD')['committer']['timestamp']
         root_commit_timestamp = min([
-            repo.get_commit_metadata(commit)['committer']['timestamp']
-            for commit in root_commits
+            commit_metadata['committer']['timestamp']
+            for commit_metadata in repo.get_commits_metadata(root_commits).values()
         ])
 
         results[repo_name] = {
@@ -48,7 +48,7 @@ from src.data.common import (load_repositories_json,
                              compute_chatgpt_sharings_stats, add_is_cloned_column)
 from src.data.sharings import find_most_recent_issue_sharings
 from src.utils.functools import timed
-from src.utils.github import GITHUB_API_TOKEN
+from src.utils.github import get_github_api_token
 
 # constants
 ERROR_ARGS = 1
@@ -241,8 +241,9 @@ def retrieve_closing_commit_sha_for_issue(issue_sharings):
 
     issue_closer_shas = defaultdict(list)
     print("Adding 'Sha' of issue-closing commit...", file=sys.stderr)
-    if not GITHUB_API_TOKEN:
-        print("WARNING: no GitHub API token found, skipping...", file=sys.stderr)
+    github_api_token = get_github_api_token()
+    if not github_api_token:
+        print("WARNING: no GitHub API token found in GITHUB_API_TOKEN, skipping...", file=sys.stderr)
         return issue_closer_shas
 
     stats = {
@@ -254,7 +255,7 @@ def retrieve_closing_commit_sha_for_issue(issue_sharings):
         'n_closer_commit': 0,
         'n_closer_other': 0,
     }
-    with ghgql.GithubGraphQL(token=GITHUB_API_TOKEN) as ghapi:
+    with ghgql.GithubGraphQL(token=github_api_token) as ghapi:
         for source in tqdm(issue_sharings, desc="source (query 'Sha')"):
             owner, repo = source['RepoName'].split('/', maxsplit=1)
             issue = source['Number']  # Issue number of this issue
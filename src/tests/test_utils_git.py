@@ -1,5 +1,6 @@
 import unittest
 
+import io
 import os
 import shutil
 import subprocess
@@ -10,7 +11,7 @@ from pathlib import Path
 from unidiff import PatchSet
 
 from src.tests import slow_test
-from src.utils.git import (GitRepo, DiffSide, AuthorStat,
+from src.utils.git import (GitRepo, DiffSide, AuthorStat, StartLogFrom,
                            changes_survival_perc, parse_shortlog_count, select_core_authors,
                            decode_c_quoted_str)
 
@@ -139,6 +140,9 @@ class GitTestCase(unittest.TestCase):
         actual = self.repo.list_files()
         self.assertCountEqual(expected, actual, "list of files in HEAD")
 
+        actual = self.repo.iter_files()
+        self.assertCountEqual(expected, actual, "files in HEAD, via iterator")
+
     def test_list_changed_files(self):
         """Test that GitRepo.list_changed_files returns correct list of files"""
         expected = [
@@ -157,6 +161,9 @@ class GitTestCase(unittest.TestCase):
         actual = self.repo.list_changed_files('v2', side=DiffSide.PRE)
         self.assertCountEqual(expected, actual, "list of changed files in v2 (post)")
 
+        actual = self.repo.iter_changed_files('v2', side=DiffSide.PRE)
+        self.assertCountEqual(expected, list(actual), "iter_changed_files gives the same files")
+
     def test_diff_file_status(self):
         """Test the result of GitRepo.diff_file_status"""
         expected = {
@@ -166,6 +173,31 @@ class GitTestCase(unittest.TestCase):
         }
         actual = self.repo.diff_file_status('v2')
         self.assertCountEqual(expected, actual, "status of changed files in v2")
+        self.assertEqual(expected, actual, "status letters of changed files in v2")
+
+        expected_v1 = {
+            (None, 'example_file'): 'A',  # root commit v1 added all files
+            (None, 'subdir/subfile'): 'A',
+        }
+        actual = self.repo.diff_file_status('v1')
+        self.assertEqual(expected_v1, actual, "status of changed files in root commit v1")
+        self.assertCountEqual(['example_file', 'subdir/subfile'], self.repo.list_changed_files('v1'),
+                              "list of changed files in root commit v1")
+        self.assertFalse(self.repo._is_root_commit('no-such-ref'),
+                         "invalid commit is not a root commit, and does not raise")
+
+        actual_iter = list(self.repo.iter_diff_file_status('v2'))
+        self.assertCountEqual([(status, pre, post) for (pre, post), status in expected.items()],
+                              actual_iter, "iter_diff_file_status gives the same data")
+
+    def test_files_and_changes(self):
+        """Test the result of GitRepo.files_and_changes"""
+        files, changes = self.repo.files_and_changes('v2')
+        self.assertEqual(self.repo.diff_file_status('v2'), changes, "changes are the same as from diff_file_status")
+        self.assertCountEqual(self.repo.list_changed_files('v2'), files, "post-image of changed files in v2")
+
+        files, _ = self.repo.files_and_changes('v2', include_unchanged=True)
+        self.assertCountEqual(self.repo.list_files('v2'), files, "all files in v2")
 
     def test_unidiff(self):
         """Test extracting data from GitRepo.unidiff"""
@@ -247,6 +279,67 @@ class GitTestCase(unittest.TestCase):
         actual = self.repo.file_contents('v2', 'renamed_file')
         self.assertEqual(expected, actual, "contents of 'renamed_file' at v2")
 
+        actual = self.repo.file_contents('v1', 'renamed_file')
+        self.assertEqual('', actual, "no 'renamed_file' at v1")
+
+        actual = self.repo.file_contents('v1', 'no such')
+        self.assertEqual('', actual, "no 'no such' file (path with one space) at v1")
+
+        actual = self.repo.file_contents('v1', 'subdir')
+        self.assertEqual('', actual, "'subdir' is a directory, not a file")
+        actual = self.repo.file_contents('v1', 'example_file')
+        self.assertEqual('example\n2\n3\n4\n5\n', actual,
+                         "next request after directory gets correct contents")
+
+        # helper process is restarted on demand after close()
+        self.repo.close()
+        expected = 'subfile'
+        actual = self.repo.file_contents('v1', 'subdir/subfile')
+        self.assertEqual(expected, actual, "contents of 'subdir/subfile' at v1 after close()")
+
+        # helper process released by close() is reused by another GitRepo object
+        pid = self.repo._cat_file.pid
+        self.repo.close()
+        other_repo = GitRepo(self.repo.repo)
+        actual = other_repo.file_contents('v1', 'subdir/subfile')
+        self.assertEqual(expected, actual, "contents of 'subdir/subfile' at v1 from other GitRepo")
+        self.assertEqual(pid, other_repo._cat_file.pid, "'git cat-file' process reused")
+        other_repo.close()
+
+        # pooled process is keyed by absolute path resolved when GitRepo was created
+        abs_repo_path = os.path.abspath(self.repo.repo)
+        pid = self.repo._cat_file.pid
+        cwd = os.getcwd()
+        try:
+            os.chdir(os.pardir)
+            self.repo.close()
+            other_repo = GitRepo(abs_repo_path)
+            actual = other_repo.file_contents('v1', 'subdir/subfile')
+            self.assertEqual(expected, actual, "contents read after changing working directory")
+            self.assertEqual(pid, other_repo._cat_file.pid,
+                             "'git cat-file' process returned under the same key")
+            other_repo.close()
+        finally:
+            os.chdir(cwd)
+
+    def test_file_bytes(self):
+        """Test that GitRepo.file_bytes returns file contents as bytes"""
+        expected = b'example\n2\n3\n4\n5\n'
+        actual = self.repo.file_bytes('v1', 'example_file')
+        self.assertEqual(expected, actual, "raw contents of 'example_file' at v1")
+
+    def test_copy_file_to(self):
+        """Test that GitRepo.copy_file_to copies file contents to binary file"""
+        expected = b'example\n2\n3\n4\n5\n'
+        with io.BytesIO() as fpb:
+            actual_size = self.repo.copy_file_to('v1', 'example_file', fpb, bufsize=4)
+            actual = fpb.getvalue()
+
+        self.assertEqual(expected, actual, "copied contents of 'example_file' at v1")
+        self.assertEqual(len(expected), actual_size, "returned number of bytes copied")
+        self.assertEqual(expected, self.repo.file_bytes('v1', 'example_file'),
+                         "subsequent read of 'example_file' at v1 works")
+
     def test_open_file(self):
         """Test that GitRepo.open_file works as a context manager, returning binary file"""
         expected = b'example\n2\n3\n4\n5\n'
@@ -304,6 +397,21 @@ class GitTestCase(unittest.TestCase):
         self.assertEqual(commit_info['committer']['committer'], 'A U Thor <author@example.com>',
                          "committer matches repository setup")
 
+    def test_get_commits_metadata(self):
+        """Test that GitRepo.get_commits_metadata retrieves info for many commits"""
+        commits_info = self.repo.get_commits_metadata(['v2', 'v1', 'HEAD'])
+
+        self.assertEqual(list(commits_info.keys()),
+                         [self.repo.to_oid('v2'), self.repo.to_oid('v1')],
+                         "keys are SHA-1 identifiers of unique commits, in order")
+        self.assertEqual(commits_info[self.repo.to_oid('v2')],
+                         self.repo.get_commit_metadata('v2'),
+                         "same result as get_commit_metadata for v2")
+        self.assertEqual(commits_info[self.repo.to_oid('v1')]['parents'], [],
+                         "v1 is a root commit")
+        self.assertEqual(self.repo.get_commits_metadata([]), {},
+                         "empty result for empty list of commits")
+
     def test_is_valid_commit(self):
         """Test that GitRepo.is_valid_commit returns correct answer
 
@@ -327,6 +435,25 @@ class GitTestCase(unittest.TestCase):
         self.assertFalse(self.repo.is_valid_commit("HEAD^3"), "HEAD^3 is invalid")
         self.assertFalse(self.repo.is_valid_commit("HEAD~20"), "HEAD~20 is invalid")
 
+    def test_to_oids(self):
+        """Test that GitRepo.to_oids gives the same results as GitRepo.to_oid"""
+        refs = ["HEAD", "v1", "HEAD^", "non_existent", "HEAD~20"]
+        expected = [self.repo.to_oid(ref) for ref in refs]
+        self.assertEqual(expected, self.repo.to_oids(refs), "batch conversion to SHA-1 identifiers")
+        self.assertIsNone(expected[-1], "HEAD~20 is not found")
+
+    def test_clear_cache(self):
+        """Test that cached results of GitRepo methods are invalidated"""
+        self.assertFalse(self.repo.is_valid_commit("v_cached"), "no 'v_cached' tag yet")
+        self.repo.create_tag('v_cached', 'v1')  # clears the cache
+        self.assertTrue(self.repo.is_valid_commit("v_cached"), "'v_cached' tag was created")
+
+        subprocess.run(['git', '-C', self.repo_path, 'tag', '-d', 'v_cached'],
+                       check=True, stdout=subprocess.DEVNULL)  # noisy
+        self.assertTrue(self.repo.is_valid_commit("v_cached"), "stale cached result")
+        self.repo.clear_cache()
+        self.assertFalse(self.repo.is_valid_commit("v_cached"), "no 'v_cached' tag after clearing cache")
+
     def test_get_current_branch(self):
         """Basic test of GitRepo.get_current_branch"""
         self.assertEqual(self.repo.get_current_branch(), self.default_branch,
@@ -394,6 +521,14 @@ class GitTestCase(unittest.TestCase):
             for blame_line, line_no in zip(line_data, line_extent, strict=True):
                 self.assertEqual(int(blame_line['final']), line_no, f"line number match for line number {line_no}")
 
+        with self.subTest("reverse blame results are cached"):
+            commits_data, line_data = self.repo.reverse_blame('v1', 'subdir/subfile')
+            line_data[0]['previous'] = 'modified by caller'
+            commits_data.clear()
+            commits_data_2, line_data_2 = self.repo.reverse_blame('v1', 'subdir/subfile')
+            self.assertNotIn('previous', line_data_2[0], "cached line info is not modified")
+            self.assertTrue(commits_data_2, "cached commits info is not modified")
+
     def test_changes_survival(self):
         with self.subTest("changes survival from v1.5"):
             _, survival_info = self.repo.changes_survival("v1.5")
@@ -438,6 +573,28 @@ class GitTestCase(unittest.TestCase):
                 for line_info in lines:
                     self.assertNotIn('previous', line_info)
 
+        with self.subTest("changes survival from v1 (n_jobs=2)"):
+            expected_commits, expected_survival = self.repo.changes_survival("v1", prev=self.repo.empty_tree_sha1)
+            self.repo.clear_cache()  # do not use cached reverse blame results
+            actual_commits, actual_survival = self.repo.changes_survival("v1", prev=self.repo.empty_tree_sha1,
+                                                                         n_jobs=2)
+            self.assertEqual(expected_commits, actual_commits, "the same blamed commits info")
+            self.assertEqual(
+                {path: [line_info['final'] for line_info in lines] for path, lines in expected_survival.items()},
+                {path: [line_info['final'] for line_info in lines] for path, lines in actual_survival.items()},
+                "the same lines, in the same order"
+            )
+            self.assertEqual(changes_survival_perc(expected_survival), changes_survival_perc(actual_survival),
+                             "the same survival statistics")
+
+    def test_map_commits(self):
+        """Test that GitRepo.map_commits returns results in order of commits"""
+        commits = ['v1', 'v1.5', 'v2', 'HEAD']
+        expected = [self.repo.to_oid(commit) for commit in commits]
+        actual = self.repo.map_commits(lambda commit, repo: repo.get_commit_metadata(commit)['id'],
+                                       commits, workers=2)
+        self.assertEqual(expected, actual, "SHA-1 of commits, in order")
+
     def test_count_commits(self):
         """Basic tests for GitRepo.count_commits() method"""
         expected = 3  # v1, v1.5, v2
@@ -449,6 +606,13 @@ class GitTestCase(unittest.TestCase):
             actual = self.repo.count_commits('HEAD')
             self.assertEqual(expected, actual, "number of commits in repository matches")
 
+        with self.subTest("until_commit"):
+            # boundary commit 'v1' is included in the count
+            self.assertEqual(3, self.repo.count_commits('v2', until_commit='v1'),
+                             "number of commits from 'v2' down to 'v1' matches")
+            self.assertEqual(0, self.repo.count_commits('v2', until_commit='v2'),
+                             "no commits if start_from is the same as until_commit")
+
     def test_list_authors(self):
         """Test GitRepo.list_authors_shortlog() and related methods"""
         expected = [
@@ -495,6 +659,16 @@ class GitTestCase(unittest.TestCase):
         self.assertGreaterEqual(perc, 0.5, 'core authors add up to more than 0.5 of commits')
         self.assertEqual(core, expected, 'core authors match expectation for repo')
 
+    def test_collect_repo_summary(self):
+        """Test that GitRepo.collect_repo_summary() matches separate queries"""
+        for start_from in [StartLogFrom.CURRENT, 'v1.5', 'v1']:
+            with self.subTest(start_from=start_from):
+                summary = self.repo.collect_repo_summary(start_from)
+                self.assertEqual(self.repo.count_commits(start_from), summary.count,
+                                 "number of commits matches")
+                self.assertEqual(self.repo.find_roots(start_from), summary.roots,
+                                 "root commits match")
+
     def test_find_roots(self):
         """Test GitRepo.find_roots() method"""
         roots_list = self.repo.find_roots()
@@ -503,6 +677,10 @@ class GitTestCase(unittest.TestCase):
         v1_oid = self.repo.to_oid("v1")
         self.assertEqual(roots_list[0], v1_oid, "root commit is v1")
 
+        roots_iter = self.repo.iter_roots()
+        self.assertEqual(next(roots_iter), v1_oid, "first root commit from iter_roots is v1")
+        roots_iter.close()  # stops 'git rev-list'
+
     def test_get_config(self):
         """Test GitRepo.get_config() method"""
         expected = 'A U Thor'  # set up in setUpClass() class method
@@ -554,6 +732,19 @@ class GitClassMethodsTestCase(unittest.TestCase):
             repo = GitRepo.clone_repository(repo_url)
             self.assertIsNone(repo, f"repo for {repo_url} is None")
 
+    def test_iter_lines(self):
+        """Test GitRepo._iter_lines() on command writing a lot to stderr"""
+        # more than pipe buffer (64 KiB on Linux) of "warnings" before the output
+        script = ("import sys; sys.stderr.write('warning\\n' * 100000); "
+                  "sys.stdout.write('a\\nb\\n'); sys.exit(int(sys.argv[1]))")
+        actual = list(GitRepo._iter_lines([sys.executable, '-c', script, '0']))
+        self.assertEqual([b'a', b'b'], actual, "output is read without blocking on stderr")
+
+        with self.assertRaises(subprocess.CalledProcessError) as cm:
+            list(GitRepo._iter_lines([sys.executable, '-c', script, '1']))
+        self.assertTrue(cm.exception.stderr.startswith(b'warning\n'),
+                        "stderr of failed command is available in the exception")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,13 +1,19 @@
+import contextlib
+import io
 import os
+import time
 import unittest
 
 import fnc
 import ghgql
+import github
 
-from src.utils.github import is_github, full_name_from_github_url, GITHUB_API_TOKEN
+from src.utils.github import is_github, full_name_from_github_url, get_github_api_token
 from src.utils.github import (get_Github, get_github_repo, get_github_commit,
                               get_github_issue, get_github_pull_request,
-                              get_github_repo_cached)
+                              get_github_repo_cached, rate_limited_github_api,
+                              get_github_commits_batch, get_github_issues_batch)
+from src.utils.github import _rate_limit_sleep_time
 
 from src.tests import can_connect_to_url
 
@@ -47,6 +53,7 @@ class NoNetworkGitHubTestCase(unittest.TestCase):
             'https://github.com/pallets/flask.git': 'pallets/flask',
             'https://github.com/jakubroztocil/httpie/': 'jakubroztocil/httpie',
             'https://github.com/matrix-org/synapse.git/': 'matrix-org/synapse',
+            'git@github.com:ncusi/python_bug_localization.git': 'ncusi/python_bug_localization',
         }
         for (url, full_name) in github_url_to_name.items():
             self.assertEqual(full_name, full_name_from_github_url(url),
@@ -77,6 +84,70 @@ class NoNetworkGitHubTestCase(unittest.TestCase):
             self.assertIsNone(full_name_from_github_url(url),
                               f"invalid GitHub URL for repo name extraction: {url}")
 
+    def test_rate_limited_github_api(self):
+        """Test `utils.github.rate_limited_github_api` for cases without rate limit"""
+        @rate_limited_github_api
+        def get_value(value):
+            return value
+
+        @rate_limited_github_api
+        def get_not_found(name):
+            raise github.UnknownObjectException(404, data={'message': 'Not Found'}, headers={})
+
+        self.assertEqual('value', get_value('value'), "value is passed through")
+        self.assertIsNone(get_value(None), "None result is returned, not retried")
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertIsNone(get_not_found('missing'), "not found object gives None")
+        self.assertIn("not found", output.getvalue(), "warning is printed for not found object")
+
+    def test_rate_limit_sleep_time(self):
+        """Test that delay before retry respects headers and adds bounded jitter"""
+        sleep_for = _rate_limit_sleep_time({'retry-after': '10',
+                                            'x-ratelimit-reset': '0'})
+        self.assertTrue(10 <= sleep_for <= 11, "'retry-after' header takes precedence")
+
+        sleep_for = _rate_limit_sleep_time({'x-ratelimit-reset': str(int(time.time()) + 1000)})
+        self.assertTrue(990 <= sleep_for <= 1030, "waits until rate limit resets, plus jitter")
+
+        sleep_for = _rate_limit_sleep_time({'x-ratelimit-reset': '0'})
+        self.assertTrue(1 <= sleep_for <= 1.1, "waits minimum 1 second")
+
+    def test_get_github_issues_batch_errors(self):
+        """Test that `utils.github.get_github_issues_batch` handles GraphQL errors"""
+        class FakeGraphQL:
+            """Returns fixed response to any GraphQL query"""
+            def __init__(self, response):
+                self.response = response
+
+            def query(self, query, variables):
+                return self.response
+
+        not_found = FakeGraphQL({
+            'data': {'repository': {'o0': {'number': 1}, 'o1': None}},
+            'errors': [{'type': 'NOT_FOUND', 'path': ['repository', 'o1'],
+                        'message': "Could not resolve to an issue or pull request with the number of 2."}],
+        })
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            issues = get_github_issues_batch(not_found, 'owner/repo', [1, 2])
+        self.assertEqual({1: {'number': 1}, 2: None}, issues, "not found issue gives None")
+        self.assertEqual('', output.getvalue(), "no warning for not found issue")
+
+        rate_limited = FakeGraphQL({
+            'data': None,
+            'errors': [{'type': 'RATE_LIMITED', 'message': "API rate limit exceeded"}],
+        })
+        with self.assertRaisesRegex(RuntimeError, "rate limit"):
+            get_github_issues_batch(rate_limited, 'owner/repo', [1, 2])
+
+        partial = FakeGraphQL({
+            'data': {'repository': {'o0': {'number': 1}, 'o1': None}},
+            'errors': [{'type': 'SERVICE_UNAVAILABLE', 'path': ['repository', 'o1'],
+                        'message': "Something went wrong"}],
+        })
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            get_github_issues_batch(partial, 'owner/repo', [1, 2])
+        self.assertIn("WARNING", output.getvalue(), "warning is printed for other errors")
+
 
 @unittest.skipIf('SKIP_SLOW_TESTS' in os.environ, 'Skipping slow networked tests')
 @unittest.skipUnless(
@@ -212,8 +283,9 @@ class NetworkedGitHubGraphQLTestCase(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
         """Set-up GitHub GraphQL API client once for all tests"""
-        if GITHUB_API_TOKEN:
-            cls.ghapi = ghgql.GithubGraphQL(token=GITHUB_API_TOKEN)
+        token = get_github_api_token()
+        if token:
+            cls.ghapi = ghgql.GithubGraphQL(token=token)
         else:
             raise unittest.SkipTest("No GITHUB_API_TOKEN, required for GraphQL queries")
 
@@ -279,6 +351,25 @@ class NetworkedGitHubGraphQLTestCase(unittest.TestCase):
                 self.assertTrue(has_closer, f"{owner}/{repo} has closer for #{issue}")
                 self.assertEqual(typename, expected, f"{owner}/{repo} closer for #{issue} matches")
 
+    def test_get_github_commits_batch(self):
+        """Test `utils.github.get_github_commits_batch` with existing and non-existing commit"""
+        commit_id = 'f82ad61c37b997fe00978e12cdd4d62d320db06a'
+        missing_id = '0' * 40
+        commits = get_github_commits_batch(self.ghapi, 'PyGithub/PyGithub', [commit_id, missing_id])
+
+        self.assertCountEqual([commit_id, missing_id], commits.keys(), "result for each commit")
+        self.assertEqual(commit_id, commits[commit_id]['oid'], "commit id matches")
+        self.assertIsNone(commits[missing_id], "no data for non-existing commit")
+
+    def test_get_github_issues_batch(self):
+        """Test `utils.github.get_github_issues_batch` (positive case only)"""
+        issues = get_github_issues_batch(self.ghapi, 'PyGithub/PyGithub', [874, 2393])
+
+        self.assertEqual('Issue', issues[874]['__typename'], "#874 is an issue")
+        self.assertEqual('PyGithub example usage', issues[874]['title'], "issue title matches")
+        self.assertEqual('PullRequest', issues[2393]['__typename'], "#2393 is a pull request")
+        self.assertTrue(issues[2393]['merged'], "pull request #2393 is merged")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -15,6 +15,10 @@ class StringsTestCase(unittest.TestCase):
         expected = 'https://github.com/abrt/abrt'
         self.assertEqual(expected, actual, "with list of suffixes to strip")
 
+        actual = strip_suffixes("chairs", ["", "s"])
+        expected = 'chair'
+        self.assertEqual(expected, actual, "empty suffix does not strip anything")
+
 
 if __name__ == '__main__':
     unittest.main()
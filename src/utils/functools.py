@@ -6,8 +6,9 @@ import inspect
 import io
 import pstats
 import time
+import weakref
 from datetime import datetime, timedelta
-from functools import wraps
+from functools import lru_cache, wraps
 from pathlib import Path
 
 
@@ -66,6 +67,57 @@ def throttled(delay):
     return decorator_throttled
 
 
+def lru_cached_method(maxsize=128):
+    """Decorator caching results of method with per-instance LRU cache
+
+    Works like `functools.lru_cache`, but each instance of the class
+    gets its own cache, and the cache does not keep the instance alive
+    (it holds only a weak reference to it).  All arguments of decorated
+    method, except for `self`, must be hashable.
+
+    Caches of all decorated methods of given object can be cleared
+    with `clear_cached_methods`.
+
+    Example:
+        >>> class Repo:
+        ...     @lru_cached_method(maxsize=1024)
+        ...     def resolve(self, ref):
+        ...         return expensive_lookup(ref)
+        ...
+
+    :param maxsize: maximum number of cached calls per instance,
+        or None for unbounded cache
+    :type maxsize: int or None
+    """
+    def decorator_lru_cached_method(method):
+        @wraps(method)
+        def wrapper_lru_cached_method(self, *args, **kwargs):
+            caches = self.__dict__.setdefault('_lru_cached_methods', {})
+            cached_func = caches.get(method.__name__)
+            if cached_func is None:
+                self_ref = weakref.ref(self)
+                cached_func = lru_cache(maxsize=maxsize)(
+                    lambda *a, **kw: method(self_ref(), *a, **kw)
+                )
+                caches[method.__name__] = cached_func
+
+            return cached_func(*args, **kwargs)
+
+        return wrapper_lru_cached_method
+
+    return decorator_lru_cached_method
+
+
+def clear_cached_methods(obj):
+    """Clear caches of all `lru_cached_method`-decorated methods of `obj`
+
+    :param obj: object with methods decorated with `lru_cached_method`
+    :rtype: None
+    """
+    for cached_func in obj.__dict__.get('_lru_cached_methods', {}).values():
+        cached_func.cache_clear()
+
+
 def timed(func):
     """Decorator that times wrapped function, and prints its execution time
 
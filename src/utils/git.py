@@ -18,12 +18,21 @@ WARNING: at the time this backend does not have error handling implemented;
 it would simply return empty result, without any notification about the
 error (like incorrect repository path, or incorrect commit)!!!
 """
+import atexit
+import os
 import re
+import shutil
 import subprocess
-from collections import defaultdict
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from enum import Enum
-from operator import attrgetter
+from io import BytesIO
+from itertools import groupby
+from operator import attrgetter, countOf, methodcaller
 from os import PathLike
 from pathlib import Path
 from typing import overload, Literal, NamedTuple, Tuple
@@ -31,6 +40,40 @@ from typing import overload, Literal, NamedTuple, Tuple
 from unidiff.patch import Line as PatchLine
 from unidiff import PatchSet
 
+from src.utils.functools import lru_cached_method, clear_cached_methods
+
+# regular expressions used to parse output of git commands
+_AUTHORSHIP_RE = re.compile(r'^((.*) <(.*)>) ([0-9]+) ([-+][0-9]{4})$')
+_INDENT_RE = re.compile(r'^    ', re.MULTILINE)
+# line of 'git blame --porcelain' output: header line, TAB + line contents, or '<key> [<value>]'
+_BLAME_LINE_RE = re.compile(
+    r'^(?:(?P<sha1>[0-9a-f]{40}) (?P<orig>[0-9]+) (?P<final>[0-9]+)(?: [0-9]+)?'
+    r'|\t(?P<content>.*?)'
+    r'|(?P<key>[^ \n]+)(?: (?P<value>.*?))?)\r?$',
+    re.MULTILINE
+)
+
+# fixed parts of 'git clone' messages around the path of the repository
+_CLONE_DEST_EXISTS_PREFIX = "fatal: destination path '"
+_CLONE_DEST_EXISTS_SUFFIX = "' already exists and is not an empty directory."
+_CLONING_INTO_PREFIX = "Cloning into '"
+_CLONING_INTO_SUFFIX = "'..."
+
+# full path to git executable, found once, so that it is not searched for in PATH on each call
+_GIT = shutil.which('git') or 'git'
+
+# static parts of git command lines
+_LS_TREE_ARGS = ('ls-tree', '-r', '--name-only', '--full-tree', '-z')
+# --no-commit-id is needed for 1-argument git-diff-tree, --root to show changes of a root commit
+_DIFF_TREE_NAME_ONLY_ARGS = ('diff-tree', '-M', '-r', '--root', '--name-only', '--no-commit-id', '-z')
+_DIFF_TREE_NAME_STATUS_ARGS = (
+    'diff-tree', '--no-commit-id',
+    # turn on renames [with '-M' or '-C'];
+    # increase inexact rename detection limit
+    '--find-renames', '-l5000', '--name-status', '-r',
+    # NUL-terminated fields, no quoting of pathnames
+    '-z',
+)
 
 class DiffSide(Enum):
     """Enum to be used for `side` parameter of `GitRepo.list_changed_files`"""
@@ -53,6 +96,12 @@ class AuthorStat(NamedTuple):
     count: int = 0  #: number of commits per author
 
 
+class RepoSummary(NamedTuple):
+    """Result of GitRepo.collect_repo_summary()"""
+    count: int  #: number of commits
+    roots: list[str]  #: root commits (commits without parents), as SHA-1
+
+
 def _parse_authorship_info(authorship_line, field_name='author'):
     """Parse author/committer info, and extract individual parts
 
@@ -72,21 +121,32 @@ def _parse_authorship_info(authorship_line, field_name='author'):
     :return: dict with parsed authorship information
     :rtype: dict[str, str | int]
     """
-    # trick from https://stackoverflow.com/a/279597/
-    if not hasattr(_parse_authorship_info, 'regexp'):
-        # runs only once
-        _parse_authorship_info.regexp = re.compile(r'^((.*) <(.*)>) ([0-9]+) ([-+][0-9]{4})$')
-
-    m = _parse_authorship_info.regexp.match(authorship_line)
-    authorship_info = {
-        field_name: m.group(1),
-        'name': m.group(2),
-        'email': m.group(3),
-        'timestamp': int(m.group(4)),
-        'tz_info': m.group(5),
-    }
+    try:
+        # authorship line has rigid structure: '<name> <<email>> <timestamp> <tz_info>'
+        ident, timestamp, tz_info = authorship_line.rsplit(' ', 2)
+        if not ident.endswith('>'):
+            raise ValueError(f"no '<email>' in authorship line: {authorship_line}")
+        name, email = ident[:-1].rsplit(' <', 1)  # strip trailing '>'
+
+        return {
+            field_name: ident,
+            'name': name,
+            'email': email,
+            'timestamp': int(timestamp),
+            'tz_info': tz_info,
+        }
 
-    return authorship_info
+    except ValueError:
+        # fallback for unusual authorship lines
+        ident, name, email, timestamp, tz_info = _AUTHORSHIP_RE.match(authorship_line).groups()
+
+        return {
+            field_name: ident,
+            'name': name,
+            'email': email,
+            'timestamp': int(timestamp),
+            'tz_info': tz_info,
+        }
 
 
 def _parse_commit_text(commit_text, with_parents_line=True, indented_body=True):
@@ -106,40 +166,37 @@ def _parse_commit_text(commit_text, with_parents_line=True, indented_body=True):
     """
     # based on `parse_commit_text` from gitweb/gitweb.perl in git project
     # NOTE: cannot use .splitlines() here
-    commit_lines = commit_text.split('\n')[:-1]  # remove trailing '' after last '\n'
+    commit_text = commit_text.rstrip('\0\n')  # remove trailing NUL and '\n' after last line
 
-    if not commit_lines:
+    if not commit_text:
         return None
 
+    # commit metadata is separated from commit message by the first empty line
+    header, _, body = commit_text.partition('\n\n')
+    header_lines = header.split('\n')
     commit_data = {'parents': []}  # each commit has 0 or more parents
 
     if with_parents_line:
-        parents_data = commit_lines.pop(0).split(' ')
+        parents_data = header_lines[0].split(' ')
         commit_data['id'] = parents_data[0]
         commit_data['parents'] = parents_data[1:]
-
-    # commit metadata
-    line_no = 0
-    for (idx, line) in enumerate(commit_lines):
-        if line == '':
-            line_no = idx
-            break
-
-        if line.startswith('tree '):
-            commit_data['tree'] = line[len('tree '):]
-        if not with_parents_line and line.startswith('parent'):
-            commit_data['parents'].append(line[len('parent '):])
-        for field in ('author', 'committer'):
-            if line.startswith(f'{field} '):
-                commit_data[field] = _parse_authorship_info(line[len(f'{field} '):], field)
-
-    # commit message
-    commit_data['message'] = ''
-    for line in commit_lines[line_no+1:]:
-        if indented_body:
-            line = line[4:]  # strip starting 4 spaces: 's/^    //'
-
-        commit_data['message'] += line + '\n'
+        header_lines = header_lines[1:]
+
+    for line in header_lines:
+        key, _, value = line.partition(' ')
+        if key == 'tree':
+            commit_data['tree'] = value
+        elif key == 'parent':
+            if not with_parents_line:
+                commit_data['parents'].append(value)
+        elif key in ('author', 'committer'):
+            commit_data[key] = _parse_authorship_info(value, key)
+
+    # commit message, the rest of text
+    if indented_body:
+        # strip starting 4 spaces: 's/^    //'
+        body = _INDENT_RE.sub('', body)
+    commit_data['message'] = body + '\n' if body else ''
 
     return commit_data
 
@@ -177,59 +234,70 @@ def _parse_blame_porcelain(blame_text):
     :return: information about commits (dict) and information about lines (list)
     :rtype: (dict, list)
     """
-    # trick from https://stackoverflow.com/a/279597/
-    if not hasattr(_parse_blame_porcelain, 'regexp'):
-        # runs only once
-        _parse_blame_porcelain.regexp = re.compile(r'^(?P<sha1>[0-9a-f]{40}) (?P<orig>[0-9]+) (?P<final>[0-9]+)')
+    # empty lines (which shouldn't happen) are skipped by finditer
+    return _parse_blame_matches(_BLAME_LINE_RE.finditer(blame_text))
 
-    # https://git-scm.com/docs/git-blame#_the_porcelain_format
-    blame_lines = blame_text.splitlines()
-    if not blame_lines:
-        # TODO: return NamedTuple
-        return {}, []
 
+def _parse_blame_porcelain_lines(blame_lines):
+    """Parse 'git blame --porcelain' output line by line
+
+    Like `_parse_blame_porcelain`, but takes an iterable of lines, which
+    allows to parse the output while the command is still running.
+
+    :param blame_lines: lines of standard output from running the
+        'git blame --porcelain [--reverse]' command, with or without
+        the line terminator
+    :type blame_lines: typing.Iterable[str]
+    :return: information about commits (dict) and information about lines (list)
+    :rtype: (dict, list)
+    """
+    # empty lines (which shouldn't happen) do not match, and are skipped
+    return _parse_blame_matches(filter(None, map(_BLAME_LINE_RE.match, blame_lines)))
+
+
+def _parse_blame_matches(matches):
+    """Helper function for `_parse_blame_porcelain` and `_parse_blame_porcelain_lines`
+
+    :param matches: matches of `_BLAME_LINE_RE` for subsequent lines
+    :type matches: typing.Iterable[re.Match]
+    :return: information about commits (dict) and information about lines (list)
+    :rtype: (dict, list)
+    """
+    # https://git-scm.com/docs/git-blame#_the_porcelain_format
     curr_commit = None
     curr_line = {}
-    commits_data = {}
+    commits_data = defaultdict(dict)
     line_data = []
 
-    for line in blame_lines:
-        if not line:  # empty line, shouldn't happen
-            continue
+    for match in matches:
+        sha1, orig, final, content, key, value = match.groups()
 
-        if match := _parse_blame_porcelain.regexp.match(line):
-            curr_commit = match.group('sha1')
+        if sha1 is not None:
+            # header line
+            curr_commit = sha1
             curr_line = {
                 'commit': curr_commit,
-                'original': match.group('orig'),
-                'final': match.group('final')
+                'original': orig,
+                'final': final
             }
             if curr_commit in commits_data:
                 curr_line['original_filename'] = decode_c_quoted_str(commits_data[curr_commit]['filename'])
 
                 # TODO: move extracting 'previous_filename' here, unquote if needed
 
-        elif line.startswith('\t'):  # TAB
-            # the contents of the actual line
-            curr_line['line'] = line[1:]  # remove leading TAB
+        elif content is not None:
+            # the contents of the actual line, without leading TAB
+            curr_line['line'] = content
             line_data.append(curr_line)
 
         else:
-            # other header
-            if curr_commit not in commits_data:
-                commits_data[curr_commit] = {}
-            try:
-                # e.g. 'author A U Thor'
-                key, value = line.split(' ', maxsplit=1)
-            except ValueError:
-                # e.g. 'boundary'
-                key, value = (line, True)
-            commits_data[curr_commit][key] = value
+            # other header, e.g. 'author A U Thor', or 'boundary' (without value)
+            commits_data[curr_commit][key] = value if value is not None else True
             # add 'filename' as 'original_filename' to line info
             if key == 'filename':
                 curr_line['original_filename'] = decode_c_quoted_str(value)
 
-    return commits_data, line_data
+    return dict(commits_data), line_data
 
 
 def parse_shortlog_count(shortlog_lines: list[str | bytes]) -> list[AuthorStat]:
@@ -310,12 +378,14 @@ def changes_survival_perc(lines_survival):
     :return: number of surviving lines and total number of lines
     :rtype: (int, int)
     """
+    has_previous = methodcaller('__contains__', 'previous')
+
     lines_total = 0
     lines_survived = 0
-    for _, lines_info in lines_survival.items():
+    for lines_info in lines_survival.values():
         lines_total += len(lines_info)
-        lines_survived += sum(1 for line_data in lines_info
-                              if 'previous' not in line_data)
+        # count lines without 'previous' key, with the loop done in C
+        lines_survived += countOf(map(has_previous, lines_info), False)
 
     return lines_survived, lines_total
 
@@ -386,6 +456,124 @@ def decode_c_quoted_str(text):
     return text
 
 
+def _close_cat_file_process(process):
+    """Make long-running 'git cat-file --batch...' process exit, and wait for it
+
+    :param subprocess.Popen process: process to close
+    :rtype: None
+    """
+    try:
+        process.stdin.close()  # git-cat-file exits on EOF on its standard input
+    except OSError:
+        pass
+    process.stdout.close()  # to avoid ResourceWarning: unclosed file <_io.BufferedReader name=3>
+    process.wait()  # to avoid ResourceWarning: subprocess NNN is still running
+
+
+class _CatFilePool:
+    """Pool of idle long-running 'git cat-file' processes, shared between `GitRepo` objects
+
+    Processes are keyed by the absolute path to the repository and by
+    the batch option used ('--batch' or '--batch-check=<format>').
+    A `GitRepo` object takes a process from the pool when it needs one,
+    and returns it to the pool on `GitRepo.close()`, so that other `GitRepo`
+    objects for the same repository (for example the per-thread ones
+    in `GitRepo.map_commits`) do not need to spawn new git process.
+
+    Processes that were idle for longer than `idle_timeout` seconds
+    are closed on the next `acquire` or `release` call.
+    """
+
+    def __init__(self, max_idle=8, idle_timeout=60.0):
+        """Construct the pool
+
+        :param int max_idle: maximum number of idle processes per key
+        :param float idle_timeout: idle processes older than this (in seconds)
+            are closed
+        """
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        # (repo_path, batch_option) -> deque[(process, time released)], most recent last
+        self._idle = defaultdict(deque)
+
+    def _reap(self, now):
+        """Remove processes idle for too long from the pool, return them
+
+        Must be called with `self._lock` held.
+
+        :param float now: current time, as returned by `time.monotonic()`
+        :rtype: list[subprocess.Popen]
+        """
+        expired = []
+        for key, idle in list(self._idle.items()):
+            while idle and now - idle[0][1] > self.idle_timeout:
+                expired.append(idle.popleft()[0])
+            if not idle:
+                del self._idle[key]
+
+        return expired
+
+    def acquire(self, key):
+        """Take idle process for given key from the pool, if there is any
+
+        :param tuple[str, str] key: (repo_path, batch_option) pair
+        :return: running process, or None if there is no idle process
+        :rtype: subprocess.Popen or None
+        """
+        process = None
+        with self._lock:
+            expired = self._reap(time.monotonic())
+            idle = self._idle.get(key)
+            while idle:
+                candidate, _ = idle.pop()
+                if candidate.poll() is None:
+                    process = candidate
+                    break
+                expired.append(candidate)
+
+        for old_process in expired:
+            _close_cat_file_process(old_process)
+
+        return process
+
+    def release(self, key, process):
+        """Return process for given key to the pool
+
+        :param tuple[str, str] key: (repo_path, batch_option) pair
+        :param subprocess.Popen process: process that is no longer used,
+            which must not have any pending unread output
+        :rtype: None
+        """
+        with self._lock:
+            now = time.monotonic()
+            expired = self._reap(now)
+            idle = self._idle[key]
+            if process.poll() is None and len(idle) < self.max_idle:
+                idle.append((process, now))
+            else:
+                expired.append(process)
+
+        for old_process in expired:
+            _close_cat_file_process(old_process)
+
+    def clear(self):
+        """Close all idle processes in the pool
+
+        :rtype: None
+        """
+        with self._lock:
+            processes = [process for idle in self._idle.values() for process, _ in idle]
+            self._idle.clear()
+
+        for process in processes:
+            _close_cat_file_process(process)
+
+
+_cat_file_pool = _CatFilePool()
+atexit.register(_cat_file_pool.clear)
+
+
 class GitRepo:
     """Class representing Git repository, for performing operations on"""
     path_encoding = 'utf8'
@@ -396,11 +584,27 @@ class GitRepo:
     # https://github.com/git/git/commit/346245a1bb6272dd370ba2f7b9bf86d3df5fed9a
     # https://github.com/git/git/commit/e1ccd7e2b1cae8d7dab4686cddbd923fb6c46953
     empty_tree_sha1 = '4b825dc642cb6eb9a060e54bf8d69288fbee4904'
+    # attributes holding helper 'git cat-file' processes, and their batch options
+    _cat_file_helpers = (
+        ('_cat_file_process', '--batch'),
+        ('_cat_check_process', '--batch-check=%(objectname) %(objecttype)'),
+    )
 
     def __init__(self, git_directory):
         # TODO: check that `git_directory` is a path to git repository
         # TODO: remember absolute path (it is safer)
         self.repo = Path(git_directory)
+        # common start of all git commands run on this repository
+        self._git_prefix = (_GIT, '-C', str(self.repo))
+        # resolved once, so that pooled 'git cat-file' processes are started in,
+        # and keyed by, the same directory even if current working directory changes
+        self._abs_repo = os.path.abspath(self.repo)
+        # long-running 'git cat-file --batch' and '--batch-check' processes, started on first use
+        self._cat_file_process = None
+        self._cat_check_process = None
+
+    def __del__(self):
+        self.close()
 
     def __repr__(self):
         class_name = type(self).__name__
@@ -409,6 +613,108 @@ class GitRepo:
     def __str__(self):
         return f"{self.repo!s}"
 
+    def close(self):
+        """Release helper 'git cat-file' processes, if they were started
+
+        The processes are returned to the pool shared between `GitRepo`
+        objects, to be reused by other objects for the same repository.
+        It is safe to call this method more than once; the helper processes
+        would be taken from the pool or started again on demand if needed.
+
+        :rtype: None
+        """
+        for attr_name, batch_option in self._cat_file_helpers:
+            process = getattr(self, attr_name, None)
+            if process is None:
+                continue
+
+            setattr(self, attr_name, None)
+            if _cat_file_pool is None:  # during interpreter shutdown
+                _close_cat_file_process(process)
+            else:
+                _cat_file_pool.release(self._cat_file_key(batch_option), process)
+
+    def _discard_cat_file(self):
+        """Close 'git cat-file --batch' process instead of returning it to the pool
+
+        Used if the process is in unknown state, for example if the
+        contents of the object was not read fully.
+
+        :rtype: None
+        """
+        process = self._cat_file_process
+        if process is not None:
+            self._cat_file_process = None
+            _close_cat_file_process(process)
+
+    def clear_cache(self):
+        """Clear cached results of git queries
+
+        Results of methods like `get_commit_metadata`, `is_valid_commit`,
+        `resolve_symbolic_ref`, `get_current_branch`, `find_commit_by_timestamp`,
+        `reverse_blame`, `count_commits`, and `find_roots` are cached.
+        The cache is cleared automatically by methods that change the
+        repository, like `checkout_revision` and `create_tag`, but it needs
+        to be cleared explicitly if repository was changed by other means.
+
+        :rtype: None
+        """
+        clear_cached_methods(self)
+
+    def _cat_file_key(self, batch_option):
+        """Key for `_cat_file_pool` for given 'git cat-file' batch option
+
+        :param str batch_option: '--batch' or '--batch-check' option for git-cat-file
+        :rtype: tuple[str, str]
+        """
+        return self._abs_repo, batch_option
+
+    def _cat_file_helper(self, attr_name, batch_option):
+        """Return long-running 'git cat-file' process stored in `attr_name`, start if needed
+
+        Idle process for the same repository is taken from the pool,
+        if there is one; otherwise new process is started.
+
+        :param str attr_name: name of attribute to store the process in
+        :param str batch_option: '--batch' or '--batch-check' option for git-cat-file
+        :rtype: subprocess.Popen
+        """
+        process = getattr(self, attr_name)
+        if process is None or process.poll() is not None:
+            process = _cat_file_pool.acquire(self._cat_file_key(batch_option))
+            if process is None:
+                cmd = [
+                    _GIT, '-C', self._abs_repo,
+                    'cat-file', batch_option
+                ]
+                process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            setattr(self, attr_name, process)
+
+        return process
+
+    @property
+    def _cat_file(self):
+        """Long-running 'git cat-file --batch' process, started lazily
+
+        Reading blobs via this process avoids spawning new process
+        for each file to read.
+
+        :rtype: subprocess.Popen
+        """
+        # default format is '<oid> SP <type> SP <size> LF', followed by contents
+        return self._cat_file_helper(*self._cat_file_helpers[0])
+
+    @property
+    def _cat_check(self):
+        """Long-running 'git cat-file --batch-check' process, started lazily
+
+        Checking objects via this process avoids spawning new process
+        for each check.
+
+        :rtype: subprocess.Popen
+        """
+        return self._cat_file_helper(*self._cat_file_helpers[1])
+
     @classmethod
     def clone_repository(cls, repository, directory=None,
                          working_dir=None,
@@ -444,16 +750,19 @@ class GitRepo:
             otherwise `None`.
         :type: GitRepo or None
         """
+        # directory relative paths are resolved against, computed only once
+        base_dir = Path(working_dir or '').absolute() if make_path_absolute else None
+
         def _to_repo_path(a_path: str):
             if make_path_absolute:
                 if Path(a_path).is_absolute():
                     return a_path
                 else:
-                    return Path(working_dir or '').joinpath(a_path).absolute()
+                    return base_dir / a_path
 
             return a_path
 
-        args = ['git']
+        args = [_GIT]
         if working_dir is not None:
             args.extend(['-C', str(working_dir)])
         if reference_local_repository:
@@ -487,9 +796,9 @@ class GitRepo:
         if result.returncode == 128:
             # repository was already cloned
             for line in result.stderr.decode(GitRepo.path_encoding).splitlines():
-                match = re.match(r"fatal: destination path '(.*)' already exists and is not an empty directory.", line)
-                if match:
-                    return GitRepo(_to_repo_path(match.group(1)))
+                if line.startswith(_CLONE_DEST_EXISTS_PREFIX) and line.endswith(_CLONE_DEST_EXISTS_SUFFIX):
+                    path = line[len(_CLONE_DEST_EXISTS_PREFIX):-len(_CLONE_DEST_EXISTS_SUFFIX)]
+                    return GitRepo(_to_repo_path(path))
 
             # could not find where repository is
             return None
@@ -499,12 +808,137 @@ class GitRepo:
             return None
 
         for line in result.stderr.decode(GitRepo.path_encoding).splitlines():
-            match = re.match(r"Cloning into '(.*)'...", line)
-            if match:
-                return GitRepo(_to_repo_path(match.group(1)))
+            if line.startswith(_CLONING_INTO_PREFIX) and line.endswith(_CLONING_INTO_SUFFIX):
+                path = line[len(_CLONING_INTO_PREFIX):-len(_CLONING_INTO_SUFFIX)]
+                return GitRepo(_to_repo_path(path))
 
         return None
 
+    def _git_out(self, *args, check=False):
+        """Run git command with given arguments in the repository, return its output
+
+        :param str args: arguments of git command, for example 'tag', '--list'
+        :param bool check: whether to raise `subprocess.CalledProcessError`
+            if git command exits with non-zero status
+        :return: standard output of the command
+        :rtype: bytes
+        """
+        return subprocess.run([*self._git_prefix, *args],
+                              capture_output=True, check=check).stdout
+
+    def _git_oneline(self, *args, encoding='latin1'):
+        """Run git command that outputs single line, return this line
+
+        Useful for commands like 'git rev-parse --verify <rev>', that
+        output single SHA-1 identifier, or single reference name.
+
+        :param str args: arguments of git command, for example 'rev-parse', 'HEAD'
+        :param str encoding: encoding of the output; the default
+            'latin1' is suitable for ASCII-only object identifiers
+        :return: output of the command without the trailing newline,
+            or None if git command exits with non-zero status
+        :rtype: str or None
+        """
+        process = subprocess.run([*self._git_prefix, *args], capture_output=True)
+        if process.returncode != 0:
+            return None
+
+        return process.stdout.rstrip(b'\n').decode(encoding)
+
+    @staticmethod
+    def _iter_nul(cmd):
+        """Run `cmd` and iterate over NUL-terminated records in its output
+
+        The output is read in chunks, and each record is decoded with
+        `GitRepo.path_encoding` when it is found, so there is no need
+        to hold the whole output in memory.
+
+        :param list[str] cmd: command to run, should use '-z' option
+        :return: generator of decoded records (without terminating NUL)
+        :rtype: typing.Iterator[str]
+        """
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+        try:
+            buf = b''
+            for chunk in iter(lambda: process.stdout.read(65536), b''):
+                *records, buf = (buf + chunk).split(b'\0')
+                for record in records:
+                    yield record.decode(GitRepo.path_encoding)
+        finally:
+            process.stdout.close()  # to avoid ResourceWarning: unclosed file <_io.BufferedReader name=3>
+            process.wait()  # to avoid ResourceWarning: subprocess NNN is still running
+
+    @staticmethod
+    @contextmanager
+    def _streamed_output(cmd):
+        """Run `cmd`, giving access to its output while it is still running
+
+        Standard error of the command is collected in a temporary file,
+        not in a pipe, so that the command cannot get blocked on writing
+        many warnings while its standard output is being read.
+
+        If the body of the `with` statement raises an exception (including
+        `GeneratorExit` when the generator using it is closed early), the
+        command is killed.  Otherwise, if the command exits with non-zero
+        status, `subprocess.CalledProcessError` is raised on leaving the
+        `with` statement, with captured standard error.
+
+        Example:
+            >>> with GitRepo._streamed_output(['git', 'rev-list', 'HEAD']) as stdout:
+            ...     commits = [line.rstrip(b'\n') for line in stdout]
+
+        :param list[str] cmd: command to run
+        :return: context manager providing standard output of the command
+            as binary stream
+        :rtype: typing.ContextManager[typing.BinaryIO]
+        """
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file)
+            with process:  # closes stdout and waits for the process on exit
+                try:
+                    yield process.stdout
+                except BaseException:
+                    process.kill()
+                    raise
+
+            if process.returncode != 0:
+                stderr_file.seek(0)
+                raise subprocess.CalledProcessError(process.returncode, cmd,
+                                                    stderr=stderr_file.read())
+
+    @staticmethod
+    def _iter_lines(cmd):
+        """Run `cmd` and iterate over lines of its output, as they arrive
+
+        If the iteration is stopped early (if generator is closed), the
+        command is killed.  If the command exits with non-zero status,
+        `subprocess.CalledProcessError` is raised at the end of iteration.
+
+        :param list[str] cmd: command to run
+        :return: generator of lines, as bytes, without end of line character
+        :rtype: typing.Iterator[bytes]
+        """
+        with GitRepo._streamed_output(cmd) as stdout:
+            for line in stdout:
+                yield line.rstrip(b'\n')
+
+    def iter_files(self, commit='HEAD'):
+        """Iterate over files at given revision in a repository
+
+        Like `list_files`, but returns generator instead of list;
+        this allows to process files one by one, as they are listed
+        by git, without keeping the whole list in memory.
+
+        :param str commit:
+            The commit for which to list all files.  Defaults to 'HEAD',
+            that is the current commit
+        :return: Full path names of all files in the repository.
+        :rtype: typing.Iterator[str]
+        """
+        args = [*self._git_prefix, *_LS_TREE_ARGS, commit]
+        # TODO: add error checking
+        return self._iter_nul(args)
+
     def list_files(self, commit='HEAD'):
         """Retrieve list of files at given revision in a repository
 
@@ -514,26 +948,14 @@ class GitRepo:
         :return: List of full path names of all files in the repository.
         :rtype: list[str]
         """
-        args = [
-            'git', '-C', str(self.repo), 'ls-tree',
-            '-r', '--name-only', '--full-tree', '-z',
-            commit
-        ]
-        # TODO: consider replacing with subprocess.run()
-        process = subprocess.Popen(args, stdout=subprocess.PIPE)
-        result = process.stdout.read()\
-            .decode(GitRepo.path_encoding)\
-            .split('\0')[:-1]
-        process.stdout.close()  # to avoid ResourceWarning: unclosed file <_io.BufferedReader name=3>
-        process.wait()  # to avoid ResourceWarning: subprocess NNN is still running
-        # TODO: add error checking
-        return result
+        return list(self.iter_files(commit))
 
-    def list_changed_files(self, commit='HEAD', side=DiffSide.POST):
-        """Retrieve list of files changed at given revision in repo
+    def iter_changed_files(self, commit='HEAD', side=DiffSide.POST):
+        """Iterate over files changed at given revision in repo
 
-        NOTE: not tested for merge commits, especially "evil merges"
-        with respect to file names.
+        Like `list_changed_files`, but returns generator instead of list,
+        which allows to process changed files one by one as they are listed
+        by git, without keeping the whole list in memory.
 
         :param str commit:
             The commit for which to list changes.  Defaults to 'HEAD',
@@ -547,32 +969,41 @@ class GitRepo:
             with side=DiffSide.PRE.  Renames are detected by Git.
 
         :return: full path names of files changed in `commit`.
-        :rtype: list[str]
+        :rtype: typing.Iterator[str]
         """
         if side == DiffSide.PRE:
-            changes_status = self.diff_file_status(commit)
-            return [
-                pre for (pre, _) in changes_status.keys()
+            return (
+                pre for (_, pre, _) in self.iter_diff_file_status(commit)
                 if pre is not None  # TODO: check how deleted files work with side=DiffSide.POST
-            ]
+            )
 
         if side != DiffSide.POST:
             raise NotImplementedError(f"GitRepo.list_changed_files: unsupported side={side} parameter")
 
-        # --no-commit-id is needed for 1-argument git-diff-tree
-        cmd = [
-            'git', '-C', self.repo, 'diff-tree', '-M',
-            '-r', '--name-only', '--no-commit-id', '-z',
-            commit
-        ]
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE)
-        result = process.stdout.read() \
-            .decode(GitRepo.path_encoding) \
-            .split('\0')[:-1]
-        process.stdout.close()  # to avoid ResourceWarning: unclosed file <_io.BufferedReader name=3>
-        process.wait()  # to avoid ResourceWarning: subprocess NNN is still running
+        cmd = [*self._git_prefix, *_DIFF_TREE_NAME_ONLY_ARGS, commit]
+        return self._iter_nul(cmd)
 
-        return result
+    def list_changed_files(self, commit='HEAD', side=DiffSide.POST):
+        """Retrieve list of files changed at given revision in repo
+
+        NOTE: not tested for merge commits, especially "evil merges"
+        with respect to file names.
+
+        :param str commit:
+            The commit for which to list changes.  Defaults to 'HEAD',
+            that is the current commit.  The changes are relative to
+            commit^, that is the previous commit (first parent of the
+            given commit).
+
+        :param DiffSide side:
+            Whether to use names of files in post-image (after changes)
+            with side=DiffSide.POST, or pre-image names (before changes)
+            with side=DiffSide.PRE.  Renames are detected by Git.
+
+        :return: full path names of files changed in `commit`.
+        :rtype: list[str]
+        """
+        return list(self.iter_changed_files(commit, side))
 
     def diff_file_status(self, commit='HEAD', prev=None):
         """Retrieve status of file changes at given revision in repo
@@ -594,7 +1025,8 @@ class GitRepo:
         :type: str
         :param prev: The commit for which to list changes from.
             If not set, then changes are relative to the parent of
-            the `commit` parameter, which means 'commit^'.
+            the `commit` parameter, which means 'commit^', or relative
+            to the empty tree if `commit` is a root commit.
         :type: str or None
         :return: Information about the status of each change.
             Returns a mapping (a dictionary), where the key is the pair (tuple)
@@ -614,38 +1046,129 @@ class GitRepo:
 
         :rtype: dict[tuple[str,str],str]
         """
-        if prev is None:
-            # NOTE: this means first-parent changes for merge commits
-            prev = commit + '^'
+        return {
+            (pre, post): status
+            for status, pre, post in self.iter_diff_file_status(commit, prev)
+        }
 
-        cmd = [
-            'git', '-C', self.repo, 'diff-tree', '--no-commit-id',
-            # turn on renames [with '-M' or '-C'];
-            # note that parsing is a bit easier without '-z', assuming that filenames are sane
-            # increase inexact rename detection limit
-            '--find-renames', '-l5000', '--name-status', '-r',
-            prev, commit
-        ]
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE)
-        lines = process.stdout.read().decode(GitRepo.path_encoding).splitlines()
-        result = {}
-        for line in lines:
-            if line[0] == 'R' or line[0] == 'C':
-                status, old, new = line.split("\t")
-                result[(old, new)] = status[0]  # no similarity info
+    def _is_root_commit(self, commit):
+        """Check if `commit` is a root commit, that is if it has no parents
+
+        Uses cached result of `get_commit_metadata`.
+
+        :param str commit: reference to a commit
+        :return: whether `commit` has no parents; False if `commit`
+            is not a valid commit
+        :rtype: bool
+        """
+        try:
+            commit_data = self.get_commit_metadata(commit)
+        except subprocess.CalledProcessError:
+            # not a valid commit; let the caller's 'git' command report the error
+            return False
+
+        return not commit_data['parents']
+
+    def _default_prev(self, commit):
+        """The revision to compare `commit` to, if it is not provided
+
+        :param str commit: reference to a commit
+        :return: 'commit^', or the empty tree for a root commit
+        :rtype: str
+        """
+        # commit^ does not exist for a root commits (for first commits)
+        if self._is_root_commit(commit):
+            return self.empty_tree_sha1
+
+        # NOTE: this means first-parent changes for merge commits
+        return commit + '^'
+
+    def files_and_changes(self, commit='HEAD', include_unchanged=False):
+        """Retrieve list of files and status of changes at given revision
+
+        By default it runs single 'git diff-tree' command, and derives
+        the list of files present in the post-image of changes (that is
+        added, modified, renamed, etc. files) from the status of changes.
+        With `include_unchanged` set to True, it lists all files at
+        the `commit` instead, which requires running additional command.
+
+        :param str commit: The commit for which to list files and changes.
+            Defaults to 'HEAD', that is the current commit.  The changes
+            are relative to commit^, the first parent of given commit.
+        :param bool include_unchanged: whether to include files that were
+            not changed in `commit` in the list of files
+        :return: list of files, and information about the status of each
+            change, in the same format as returned by `diff_file_status`
+        :rtype: (list[str], dict[tuple[str,str],str])
+        """
+        changes_status = self.diff_file_status(commit)
+        if include_unchanged:
+            files = self.list_files(commit)
+        else:
+            files = [post for (_, post) in changes_status if post is not None]
+
+        return files, changes_status
+
+    def iter_diff_file_status(self, commit='HEAD', prev=None):
+        """Iterate over status of file changes at given revision in repo
+
+        Like `diff_file_status`, but returns generator of (status, pre, post)
+        tuples instead of building a dictionary; useful if the caller
+        only needs to filter changes.
+
+        Example output (as list):
+            [
+                ('A', None, 'added_file'),
+                ('D', 'file_to_be_deleted', None),
+                ('M', 'modified', 'modified'),
+                ('R', 'to_be_renamed', 'renamed')
+            ]
+
+        :param str commit: The commit for which to list changes for.
+            Defaults to 'HEAD', that is the current commit.
+        :param prev: The commit for which to list changes from.
+            If not set, then changes are relative to the parent of
+            the `commit` parameter, which means 'commit^', or relative
+            to the empty tree if `commit` is a root commit.
+        :type prev: str or None
+        :return: generator of (status, pre-image path, post-image path),
+            see `diff_file_status` for description of status letters
+        :rtype: typing.Iterator[tuple[str, str | None, str | None]]
+        """
+        if prev is None:
+            prev = self._default_prev(commit)
+
+        cmd = [*self._git_prefix, *_DIFF_TREE_NAME_STATUS_ARGS, prev, commit]
+        # output is 'status NUL path NUL', or 'status NUL old NUL new NUL' for renames and copies
+        records = self._iter_nul(cmd)
+        for status in records:
+            if status[0] == 'R' or status[0] == 'C':
+                old = next(records)
+                new = next(records)
+                yield status[0], old, new  # no similarity info
             else:
-                status, path = line.split("\t")
+                path = next(records)
                 if status == 'A':
-                    result[(None, path)] = status
+                    yield status, None, path
                 elif status == 'D':
-                    result[(path, None)] = status
+                    yield status, path, None
                 else:
-                    result[(path, path)] = status
+                    yield status, path, path
 
-        process.stdout.close()  # to avoid ResourceWarning: unclosed file <_io.BufferedReader name=3>
-        process.wait()  # to avoid ResourceWarning: subprocess NNN is still running
+    @classmethod
+    def _decode_line(cls, line):
+        """Decode line of file contents, falling back to 8-bit encoding
 
-        return result
+        :param bytes line: line of output of git command like 'git diff',
+            which includes file contents
+        :return: line decoded with `default_file_encoding`, or if it is
+            not valid in this encoding, with `fallback_encoding`
+        :rtype: str
+        """
+        try:
+            return line.decode(cls.default_file_encoding)
+        except UnicodeDecodeError:
+            return line.decode(cls.fallback_encoding)
 
     @overload
     def unidiff(self, commit: str = ..., prev: str|None = ..., wrap: Literal[True] = ...) -> PatchSet:
@@ -681,30 +1204,27 @@ class GitRepo:
         :rtype: str or bytes or PatchSet
         """
         if prev is None:
-            try:
-                # NOTE: this means first-parent changes for merge commits
-                return self.unidiff(commit=commit, prev=commit + '^', wrap=wrap)
-            except subprocess.CalledProcessError:
-                # commit^ does not exist for a root commits (for first commits)
-                return self.unidiff(commit=commit, prev=self.empty_tree_sha1, wrap=wrap)
+            prev = self._default_prev(commit)
 
         cmd = [
-            'git', '-C', self.repo,
+            *self._git_prefix,
             'diff', '--find-renames', '--find-copies', '--find-copies-harder',
             prev, commit
         ]
-        process = subprocess.run(cmd,
-                                 capture_output=True, check=True)
-        try:
-            diff_output = process.stdout.decode(self.default_file_encoding)
-        except UnicodeDecodeError:
+        if not wrap:
+            process = subprocess.run(cmd,
+                                     capture_output=True, check=True)
+            try:
+                return process.stdout.decode(self.default_file_encoding)
+            except UnicodeDecodeError:
+                return process.stdout.decode(self.fallback_encoding)
+
+        # parse diff while 'git diff' is still running
+        with self._streamed_output(cmd) as stdout:
             # unidiff.PatchSet can only handle strings
-            diff_output = process.stdout.decode(self.fallback_encoding)
+            patch_set = PatchSet(map(self._decode_line, stdout))
 
-        if wrap:
-            return PatchSet(diff_output)
-        else:
-            return diff_output
+        return patch_set
 
     def changed_lines_extents(self, commit='HEAD', prev=None, side=DiffSide.POST):
         """List target line numbers of changed files as extents, for each changed file
@@ -751,40 +1271,133 @@ class GitRepo:
                 continue
             line_ranges = []
             for hunk in patched_file:
-                (range_beg, range_end) = (None, None)
-                for line in hunk:
-                    # we are interested only in ranges of added lines (in post-image)
-                    if line.is_added:
-                        if range_beg is None:  # first added line in line range
-                            range_beg = line.target_line_no
-                        range_end = line.target_line_no
-
-                        file_diff_lines_added[patched_file.path].append(
-                            line
-                        )
-
-                    else:  # deleted line, context line, or "No newline at end of file" line
-                        if range_beg is not None:
-                            line_ranges.append((range_beg, range_end))
-                            range_beg = None
-
-                # if diff ends with added line
-                if range_beg is not None:
-                    line_ranges.append((range_beg, range_end))
+                # we are interested only in ranges of added lines (in post-image);
+                # other lines are deleted lines, context lines, or "No newline at end of file"
+                for is_added, lines in groupby(hunk, key=attrgetter('is_added')):
+                    if not is_added:
+                        continue
+                    lines = list(lines)
+                    line_ranges.append((lines[0].target_line_no, lines[-1].target_line_no))
+                    file_diff_lines_added[patched_file.path].extend(lines)
 
             file_ranges[patched_file.path] = line_ranges
 
         return file_ranges, file_diff_lines_added
 
-    def _file_contents_process(self, commit, path):
-        cmd = [
-            'git', '-C', self.repo, 'show',  # or 'git', '-C', self.repo, 'cat-file', 'blob',
-            # assumed that 'commit' is sane
-            f'{commit}:{path}'
-        ]
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    def _cat_file_request(self, commit, path):
+        """Request contents of given file at given revision from 'git cat-file --batch'
 
-        return process
+        After this call contents of the file (if it exists), followed by LF,
+        is available for reading from standard output of `self._cat_file`
+        process, and must be read in full before making the next request.
+
+        :param str commit: The commit for which to return file contents.
+        :param str path: Path to a file, relative to the top-level of the repository
+        :return: size of the file in bytes, or None if there is no such file
+            (or if `path` is not a file, but for example a directory)
+        :rtype: int or None
+        """
+        process = self._cat_file
+        # assumed that 'commit' and 'path' are sane (do not contain newline)
+        process.stdin.write(f'{commit}:{path}\n'.encode(GitRepo.path_encoding))
+        process.stdin.flush()
+
+        # <oid> SP <type> SP <size> LF, or <object> SP missing LF
+        # (where <object> is '<commit>:<path>', which may contain spaces)
+        header = process.stdout.readline().rstrip(b'\n').rsplit(b' ', 2)
+        if header[-1] in (b'missing', b'ambiguous'):
+            return None
+
+        _, object_type, size = header
+        size = int(size)
+        if object_type != b'blob':
+            # skip contents of tree (directory) or other object, and LF after it
+            try:
+                process.stdout.read(size + 1)
+            except BaseException:
+                # unread contents would be taken as a response to the next request
+                self._discard_cat_file()
+                raise
+            return None
+
+        return size
+
+    def _cat_file_read(self, commit, path):
+        """Read contents of given file at given revision with 'git cat-file --batch'
+
+        Returns empty bytes if there is no such file at given revision,
+        in the same way as reading output of 'git show <commit>:<path>' would,
+        and also if `path` is a directory.
+
+        :param str commit: The commit for which to return file contents.
+        :param str path: Path to a file, relative to the top-level of the repository
+        :return: Contents of the file with given path at given revision
+        :rtype: bytes
+        """
+        size = self._cat_file_request(commit, path)
+        if size is None:
+            return b''
+
+        stdout = self._cat_file.stdout
+        try:
+            contents = stdout.read(size)
+            stdout.read(1)  # consume LF after contents
+        except BaseException:
+            # unread contents would be taken as a response to the next request
+            self._discard_cat_file()
+            raise
+
+        return contents
+
+    def copy_file_to(self, commit, path, dst, bufsize=1 << 20):
+        """Copy contents of given file at given revision / tree to `dst` file
+
+        Contents of the file is copied in chunks of `bufsize` bytes, without
+        reading the whole file into memory, which is useful for exporting
+        large files.
+
+        :param str commit: The commit for which to copy file contents.
+        :param str path: Path to a file, relative to the top-level of the repository
+        :param dst: file object opened for writing in binary mode
+        :type dst: typing.BinaryIO
+        :param int bufsize: size of chunks to copy, in bytes
+        :return: number of bytes copied, which is 0 if there is no such file
+        :rtype: int
+        """
+        size = self._cat_file_request(commit, path)
+        if size is None:
+            return 0
+
+        stdout = self._cat_file.stdout
+        try:
+            remaining = size
+            while remaining > 0:
+                chunk = stdout.read(min(bufsize, remaining))
+                if not chunk:
+                    break
+                dst.write(chunk)
+                remaining -= len(chunk)
+            stdout.read(1)  # consume LF after contents
+        except BaseException:
+            # unread contents would be taken as a response to the next request
+            self._discard_cat_file()
+            raise
+
+        return size - remaining
+
+    def file_bytes(self, commit, path):
+        """Retrieve contents of given file at given revision / tree as bytes
+
+        Unlike `file_contents`, it does not decode file contents; this is
+        useful for binary files, or when contents is to be written to disk
+        or hashed anyway.
+
+        :param str commit: The commit for which to return file contents.
+        :param str path: Path to a file, relative to the top-level of the repository
+        :return: Raw contents of the file with given path at given revision
+        :rtype: bytes
+        """
+        return self._cat_file_read(commit, path)
 
     def file_contents(self, commit, path, encoding=None):
         """Retrieve contents of given file at given revision / tree
@@ -799,13 +1412,7 @@ class GitRepo:
         if encoding is None:
             encoding = GitRepo.default_file_encoding
 
-        process = self._file_contents_process(commit, path)
-        result = process.stdout.read().decode(encoding)
-        # NOTE: does not handle errors correctly yet
-        process.stdout.close()  # to avoid ResourceWarning: unclosed file <_io.BufferedReader name=3>
-        process.wait()  # to avoid ResourceWarning: subprocess NNN is still running
-
-        return result
+        return self.file_bytes(commit, path).decode(encoding)
 
     @contextmanager
     def open_file(self, commit, path):
@@ -819,15 +1426,10 @@ class GitRepo:
         :param str commit: The commit for which to return file contents.
         :param str path: Path to a file, relative to the top-level of the repository
         :return: file object, opened in binary mode
-        :rtype: io.BufferedReader
+        :rtype: io.BytesIO
         """
-        process = self._file_contents_process(commit, path)
-        try:
-            yield process.stdout
-        finally:
-            # NOTE: does not handle errors correctly yet
-            process.stdout.close()  # to avoid ResourceWarning: unclosed file <_io.BufferedReader name=3>
-            process.wait()  # to avoid ResourceWarning: subprocess NNN is still running
+        with BytesIO(self._cat_file_read(commit, path)) as fpb:
+            yield fpb
 
     def checkout_revision(self, commit):
         """Check out given commit in a given repository
@@ -842,10 +1444,11 @@ class GitRepo:
         :rtype: None
         """
         cmd = [
-            'git', '-C', self.repo, 'checkout', '-q', commit,
+            *self._git_prefix, 'checkout', '-q', commit,
         ]
         # we are interested in effects of the command, not its output
         subprocess.run(cmd, stdout=subprocess.DEVNULL, check=True)
+        self.clear_cache()
 
     def list_tags(self):
         """Retrieve list of all tags in the repository
@@ -853,16 +1456,10 @@ class GitRepo:
         :return: List of all tags in the repository.
         :rtype: list[str]
         """
-        cmd = ['git', '-C', self.repo, 'tag', '--list']
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE)
-        # NOTE: f.readlines() might be not the best solution
-        tags = [line.decode(GitRepo.path_encoding).rstrip()
-                for line in process.stdout.readlines()]
-
-        process.stdout.close()  # to avoid ResourceWarning: unclosed file <_io.BufferedReader name=3>
-        process.wait()  # to avoid ResourceWarning: subprocess NNN is still running
-
-        return tags
+        # plumbing 'git for-each-ref' is faster than porcelain 'git tag --list'
+        # '%(refname:strip=2)' does not need to check if short name is ambiguous, unlike ':short'
+        output = self._git_out('for-each-ref', '--format=%(refname:strip=2)', 'refs/tags/')
+        return output.decode(GitRepo.path_encoding).splitlines()
 
     def create_tag(self, tag_name, commit='HEAD'):
         """Create lightweight tag (refs/tags/* ref) to the given commit
@@ -880,11 +1477,13 @@ class GitRepo:
         :rtype: None
         """
         cmd = [
-            'git', '-C', self.repo, 'tag', tag_name, commit,
+            *self._git_prefix, 'tag', tag_name, commit,
         ]
         # we are interested in effects of the command, not its output
         subprocess.run(cmd, stdout=subprocess.DEVNULL, check=True)
+        self.clear_cache()
 
+    @lru_cached_method(maxsize=4096)
     def get_commit_metadata(self, commit='HEAD'):
         """Retrieve metadata about given commit
 
@@ -916,23 +1515,58 @@ class GitRepo:
 
             TODO: use dataclass for result (for computed fields)
 
+            NOTE: the result is cached, and shared between calls;
+            do not modify it in place.
+
         :rtype: dict
         """
+        commits_metadata = self.get_commits_metadata([commit])
+        return next(iter(commits_metadata.values()), None)
+
+    def get_commits_metadata(self, commits):
+        """Retrieve metadata about given commits, using single git command
+
+        This is more efficient than calling `get_commit_metadata` for each
+        commit in turn, as it runs only one git process for all commits.
+
+        :param commits: The commits to examine
+        :type commits: list[str] or typing.Iterable[str]
+        :return: Information about selected parts of commit metadata for each
+            commit, mapping from SHA-1 identifier of commit to its metadata;
+            see `get_commit_metadata` for the format of the latter.  Note that
+            duplicates are removed, and that e.g. 'HEAD' and 'main' can
+            resolve to the same commit.
+        :rtype: dict[str, dict]
+        """
+        revs = '\n'.join(map(str, commits))
+        if not revs:
+            return {}
+
         # NOTE: using low level git 'plumbing' command means 'utf8' encoding is not assured
         # same as in `parse_commit` in gitweb/gitweb.perl in https://github.com/git/git
         # https://github.com/git/git/blob/3525f1dbc18ae36ca9c671e807d6aac2ac432600/gitweb/gitweb.perl#L3591C5-L3591C17
         cmd = [
-            'git', '-C', self.repo, 'rev-list',
-            '--parents', '--header', '--max-count=1', commit,
-            '--'
+            *self._git_prefix, 'rev-list',
+            # do not walk history, keep order of commits given on stdin
+            '--no-walk=unsorted', '--stdin',
+            '--parents', '--header',
         ]
-        process = subprocess.run(cmd, capture_output=True, check=True)
-        return _parse_commit_text(
-            process.stdout.decode(GitRepo.log_encoding),
-            # next parameters depend on the git command used
-            with_parents_line=True, indented_body=True
-        )
+        process = subprocess.run(cmd, input=(revs + '\n').encode(GitRepo.path_encoding),
+                                 capture_output=True, check=True)
+
+        result = {}
+        # with '--header' each commit info is terminated by NUL character
+        for commit_bytes in process.stdout.split(b'\0')[:-1]:
+            commit_data = _parse_commit_text(
+                commit_bytes.decode(GitRepo.log_encoding),
+                # next parameters depend on the git command used
+                with_parents_line=True, indented_body=True
+            )
+            result[commit_data['id']] = commit_data
 
+        return result
+
+    @lru_cached_method(maxsize=4096)
     def find_commit_by_timestamp(self, timestamp, start_commit='HEAD'):
         """Find first commit in repository older than given date
 
@@ -949,20 +1583,13 @@ class GitRepo:
 
         :rtype: str
         """
-        cmd = [
-            'git', '-C', self.repo, 'rev-list',
-            f'--min-age={timestamp}', '-1',
-            start_commit
-        ]
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE)
         # this should be US-ASCII hexadecimal identifier
-        result = process.stdout.read().decode('latin-1').strip()
         # NOTE: does not handle errors correctly yet
-
-        process.stdout.close()  # to avoid ResourceWarning: unclosed file <_io.BufferedReader name=3>
-        process.wait()  # to avoid ResourceWarning: subprocess NNN is still running
-
-        return result
+        return self._git_oneline(
+            'rev-list',
+            f'--min-age={timestamp}', '-1',
+            start_commit
+        ) or ''
 
     def to_oid(self, obj):
         """Convert object reference to object identifier
@@ -974,19 +1601,41 @@ class GitRepo:
         :return: SHA-1 identifier of object, or None if object is not found
         :rtype: str or None
         """
-        cmd = [
-            'git', '-C', self.repo,
-            'rev-parse', '--verify', '--end-of-options', obj
-        ]
-        try:
-            # emits SHA-1 identifier if object is found in the repo; otherwise, errors out
-            process = subprocess.run(cmd, capture_output=True, check=True)
-        except subprocess.CalledProcessError:
-            return None
+        # emits SHA-1 identifier if object is found in the repo; otherwise, errors out
+        return self._git_oneline('rev-parse', '--verify', '--end-of-options', obj)
+
+    def to_oids(self, objs):
+        """Convert many object references to object identifiers
+
+        Like `to_oid`, but for a list of references; it uses long-running
+        'git cat-file --batch-check' process instead of running separate
+        'git rev-parse' for each reference.
+
+        :param objs: object references, for example "HEAD" or "main^",
+            see e.g. https://git-scm.com/docs/gitrevisions; they must not
+            contain newline characters
+        :type objs: typing.Iterable[str]
+        :return: SHA-1 identifier of each object, or None in place of
+            object that is not found (or is ambiguous), in the same order
+        :rtype: list[str | None]
+        """
+        process = self._cat_check
+        result = []
+        for obj in objs:
+            process.stdin.write(f'{obj}\n'.encode(GitRepo.path_encoding))
+            process.stdin.flush()
+
+            # <oid> SP <type> LF, or <object> SP missing LF (or ambiguous)
+            oid, _, obj_type = process.stdout.readline().rstrip(b'\n').rpartition(b' ')
+            if obj_type in (b'missing', b'ambiguous'):
+                result.append(None)
+            else:
+                # SHA-1 is ASCII only
+                result.append(oid.decode('latin1'))
 
-        # SHA-1 is ASCII only
-        return process.stdout.decode('latin1').strip()
+        return result
 
+    @lru_cached_method(maxsize=4096)
     def is_valid_commit(self, commit):
         """Check if `commit` is present in the repository as a commit
 
@@ -995,8 +1644,15 @@ class GitRepo:
         :return: whether `commit` is a valid commit in repo
         :rtype: bool
         """
-        return self.to_oid(str(commit)+'^{commit}') is not None
+        process = self._cat_check
+        # assumed that 'commit' is sane (does not contain newline)
+        process.stdin.write(f'{commit}^{{commit}}\n'.encode(GitRepo.path_encoding))
+        process.stdin.flush()
+
+        # <oid> SP commit LF, or <object> SP missing LF (or ambiguous)
+        return process.stdout.readline().rstrip().endswith(b' commit')
 
+    @lru_cached_method(maxsize=4096)
     def get_current_branch(self):
         """Return short name of the current branch
 
@@ -1009,19 +1665,12 @@ class GitRepo:
         :return: name of the current branch
         :rtype: str or None
         """
-        cmd = [
-            'git', '-C', self.repo,
-            'symbolic-ref', '--quiet', '--short', 'HEAD'
-        ]
-        try:
-            # Using '--quiet' means that the command would not issue an error message
-            # but exit with non-zero status silently if HEAD is not a symbolic ref, but detached HEAD
-            process = subprocess.run(cmd, capture_output=True, check=True, text=True)
-        except subprocess.CalledProcessError:
-            return None
-
-        return process.stdout.strip()
+        # Using '--quiet' means that the command would not issue an error message
+        # but exit with non-zero status silently if HEAD is not a symbolic ref, but detached HEAD
+        return self._git_oneline('symbolic-ref', '--quiet', '--short', 'HEAD',
+                                 encoding=GitRepo.path_encoding)
 
+    @lru_cached_method(maxsize=4096)
     def resolve_symbolic_ref(self, ref='HEAD'):
         """Return full name of reference `ref` symbolic ref points to
 
@@ -1032,34 +1681,26 @@ class GitRepo:
         :return: resolved `ref`
         :rtype: str or None
         """
-        cmd = [
-            'git', '-C', self.repo,
-            'symbolic-ref', '--quiet', str(ref)
-        ]
-        try:
-            # Using '--quiet' means that the command would not issue an error message
-            # but exit with non-zero status silently if `ref` is not a symbolic ref
-            process = subprocess.run(cmd, capture_output=True, check=True, text=True)
-        except subprocess.CalledProcessError:
-            return None
-
-        return process.stdout.strip()
+        # Using '--quiet' means that the command would not issue an error message
+        # but exit with non-zero status silently if `ref` is not a symbolic ref
+        return self._git_oneline('symbolic-ref', '--quiet', str(ref),
+                                 encoding=GitRepo.path_encoding)
 
     def _to_refs_list(self, ref_pattern='HEAD'):
         # support single patter or list of patterns
         # TODO: use variable number of parameters instead (?)
-        if not isinstance(ref_pattern, list):
+        if not isinstance(ref_pattern, (list, tuple)):
             ref_pattern = [ref_pattern]
 
-        return filter(
+        # resolve symbolic references, currently only 'HEAD' is resolved, and only once
+        head_ref = self.resolve_symbolic_ref('HEAD') if 'HEAD' in ref_pattern else None
+
+        return [
+            ref if ref != 'HEAD' else head_ref
+            for ref in ref_pattern
             # filter out cases of detached HEAD, resolved to None (no branch)
-            lambda x: x is not None,
-            map(
-                # resolve symbolic references, currently only 'HEAD' is resolved
-                lambda x: x if x != 'HEAD' else self.resolve_symbolic_ref(x),
-                ref_pattern
-            )
-        )
+            if ref != 'HEAD' or head_ref is not None
+        ]
 
     def check_merged_into(self, commit, ref_pattern='HEAD'):
         """List those refs among `ref_pattern` that contain given `commit`
@@ -1083,16 +1724,30 @@ class GitRepo:
             (that contain given `commit`)
         :rtype: list[str]
         """
-        ref_pattern = self._to_refs_list(ref_pattern)
+        refs_list = self._to_refs_list(ref_pattern)
+        if not refs_list:
+            # for example detached HEAD; no patterns would mean checking all refs
+            return []
+
+        return list(self._refs_containing(commit, tuple(refs_list)))
 
+    @lru_cached_method(maxsize=4096)
+    def _refs_containing(self, commit, refs_patterns):
+        """Helper for check_merged_into, with cached results
+
+        :param str commit: The commit to check if it is merged
+        :param tuple[str, ...] refs_patterns: patterns to check refs against
+        :return: refs matching `refs_patterns` that contain given `commit`
+        :rtype: tuple[str, ...]
+        """
         cmd = [
-            'git', '-C', self.repo,
+            *self._git_prefix,
             'for-each-ref', f'--contains={commit}',  # only list refs which contain the specified commit
             '--format=%(refname)',  # we only need list of refs that fulfill the condition mentioned above
-            *ref_pattern
+            *refs_patterns
         ]
         process = subprocess.run(cmd, capture_output=True, check=True, text=True)
-        return process.stdout.splitlines()
+        return tuple(process.stdout.splitlines())
 
     def reverse_blame(self, commit, file, ref_pattern='HEAD', line_extents=None):
         """Find what revision each line of file at commit was modified since
@@ -1109,6 +1764,13 @@ class GitRepo:
         Instead of showing the revision in which a line appeared, this shows the last
         revision in which a line has existed.
 
+        Blame results for the 16 most recently used sets of arguments are
+        cached (see `clear_cache`), and this method returns a copy of cached
+        data, so the caller can modify it.  Each cached result holds data for
+        every blamed line, so the cache is kept small to limit memory used
+        by long-lived `GitRepo` objects; the cost is that copying is done
+        even when the result was not taken from the cache.
+
         :param str commit: where to start examine history from
         :param file: file to perform blame on (as a whole, or only selected lines)
         :type file: str or PathLike
@@ -1124,36 +1786,51 @@ class GitRepo:
         :return: information about commits (dict) and information about lines (list)
         :rtype: (dict, list)
         """
-        ref_pattern = self._to_refs_list(ref_pattern)
+        # NOTE: `ref_pattern` is currently unused, so there is no need to resolve it
+        if line_extents is not None:
+            line_extents = tuple(tuple(extent) for extent in line_extents)  # make it hashable
+
+        commits_data, lines_data = self._reverse_blame(commit, str(file), line_extents)
+
+        # the results are cached, and callers like `changes_survival` modify them
+        return (
+            {commit_id: dict(commit_data) for commit_id, commit_data in commits_data.items()},
+            [dict(line_info) for line_info in lines_data]
+        )
+
+    @lru_cached_method(maxsize=16)
+    def _reverse_blame(self, commit, file, line_extents):
+        """Run reverse blame and parse its output; helper for `reverse_blame`
 
+        The result is cached, and must not be modified by the caller.
+
+        :param str commit: where to start examine history from
+        :param str file: file to perform blame on
+        :param line_extents: which lines to blame, or None for whole file
+        :type line_extents: tuple[tuple[int, int], ...] or None
+        :return: information about commits (dict) and information about lines (list)
+        :rtype: (dict, list)
+        """
         line_args = []
         if line_extents is not None:
             for beg, end in line_extents:
                 line_args.extend(['-L', f'{beg},{end}'])
 
         cmd = [
-            'git', '-C', self.repo,
+            *self._git_prefix,
             'blame', '--reverse', commit, '--porcelain',
             *line_args,
-            str(file)
+            file
         ]
-        process = subprocess.run(cmd, capture_output=True, check=True)
-
-        # TODO: extract this into a helper function
-        try:
-            output = process.stdout.decode(self.default_file_encoding)
-        except UnicodeDecodeError:
-            # not a valid utf-8, simply use bytes
-            #output = process.stdout
-            # _parse_blame_porcelain _currently_ can only handle strings
-            output = process.stdout.decode(self.fallback_encoding)
+        # parse output while 'git blame' is still running
+        with self._streamed_output(cmd) as stdout:
+            # _parse_blame_porcelain_lines can only handle strings
+            result = _parse_blame_porcelain_lines(map(self._decode_line, stdout))
 
-        return _parse_blame_porcelain(
-            output
-        )
+        return result
 
     def changes_survival(self, commit, prev=None,
-                         addition_optimization=False):
+                         addition_optimization=False, n_jobs=1):
         """Find what revision each line of `commit` changes was modified since
 
         This performs reverse blame for each file modified in diff between
@@ -1197,6 +1874,9 @@ class GitRepo:
         :type prev: str or None
         :param bool addition_optimization: whether to blame whole file
             for files that were added between `prev` and `commit`
+        :param int n_jobs: number of reverse blame operations (one per
+            changed file) to run in parallel, in separate threads;
+            the default is to run them one after another
         :return: information about commits blamed, and blame information
             for each changed file
         :rtype: (dict[str, dict], dict[str, list])
@@ -1210,6 +1890,7 @@ class GitRepo:
             diff_stat = self.diff_file_status(commit, prev)
 
         changes_info, file_diff_lines = self.changed_lines_extents(commit, prev, side=DiffSide.POST)
+        blame_args = []
         for file_path, line_extents in changes_info.items():
             if not line_extents:
                 # empty changes, for example pure rename
@@ -1220,8 +1901,19 @@ class GitRepo:
                 if (None, file_path) in diff_stat:  # pure addition
                     line_extents = None  # blame whole file
 
-            commits_data, lines_data = self.reverse_blame(commit, file_path,
-                                                          line_extents=line_extents)
+            blame_args.append((file_path, line_extents))
+
+        def blame_file(args):
+            return self.reverse_blame(commit, args[0], line_extents=args[1])
+
+        # each reverse blame runs separate 'git blame' process, so threads are enough
+        if n_jobs > 1 and len(blame_args) > 1:
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                blame_results = list(executor.map(blame_file, blame_args))
+        else:
+            blame_results = map(blame_file, blame_args)
+
+        for (file_path, _), (commits_data, lines_data) in zip(blame_args, blame_results):
 
             # helper structure to find corresponding unidiff.patch.Line aka PatchLine
             lines_data_diff_lines = {}
@@ -1231,9 +1923,16 @@ class GitRepo:
                     for diff_line in file_diff_lines[file_path]
                 }
 
+            # there are usually much fewer blamed commits than lines
+            commits_previous = {
+                commit_sha: commit_data['previous']
+                for commit_sha, commit_data in commits_data.items()
+                if 'previous' in commit_data
+            }
+
             for line_info in lines_data:
-                if 'previous' in commits_data[line_info['commit']]:
-                    line_info['previous'] = commits_data[line_info['commit']]['previous']
+                if line_info['commit'] in commits_previous:
+                    line_info['previous'] = commits_previous[line_info['commit']]
 
                 line_no = int(line_info['final'])
                 if line_no in lines_data_diff_lines:
@@ -1247,6 +1946,50 @@ class GitRepo:
 
         return all_commits_data, lines_survival
 
+    def map_commits(self, func, commits, workers=8):
+        """Call `func` for each of `commits` in parallel, using a thread pool
+
+        Each worker thread gets its own `GitRepo` object for the same repository,
+        passed as the second argument to `func`; this way helper processes
+        (like 'git cat-file --batch') are not shared between threads.
+        The work is done mostly by git processes, so threads are enough
+        to run it in parallel.
+
+        Example:
+            >>> repo = GitRepo('/path/to/repo')
+            >>> trees = repo.map_commits(
+            ...     lambda commit, r: r.get_commit_metadata(commit)['tree'],
+            ...     ['v1', 'v2']
+            ... )
+
+        NOTE: `func` should only read from the repository.
+
+        :param func: function to call, as func(commit, repo)
+        :type func: typing.Callable[[str, GitRepo], typing.Any]
+        :param commits: commits to process
+        :type commits: typing.Iterable[str]
+        :param int workers: maximum number of worker threads
+        :return: results of calling `func`, in the order of `commits`
+        :rtype: list
+        """
+        thread_local = threading.local()
+        thread_repos = []
+
+        def call_func(commit):
+            repo = getattr(thread_local, 'repo', None)
+            if repo is None:
+                repo = thread_local.repo = type(self)(self.repo)
+                thread_repos.append(repo)  # list.append is thread-safe
+            return func(commit, repo)
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(call_func, commits))
+        finally:
+            for repo in thread_repos:
+                repo.close()
+
+    @lru_cached_method(maxsize=256)
     def count_commits(self, start_from=StartLogFrom.CURRENT, until_commit=None,
                       first_parent=False):
         """Count number of commits in the repository
@@ -1257,6 +2000,8 @@ class GitRepo:
         If `first_parent` is set to True, makes Git follow only the first
         parent commit upon seeing a merge commit.
 
+        The result is cached (see `clear_cache`).
+
         :param start_from: where to start from to follow 'parent' links
         :type start_from: str or StartLogFrom
         :param until_commit: where to stop following 'parent' links;
@@ -1269,49 +2014,105 @@ class GitRepo:
         """
         if hasattr(start_from, 'value'):
             start_from = start_from.value
+        if until_commit is not None and until_commit == start_from:
+            # nothing to walk, no need to run 'git rev-list'
+            return 0
         cmd = [
-            'git', '-C', self.repo,
+            *self._git_prefix,
             'rev-list', '--count', str(start_from),
         ]
         if until_commit is not None:
             cmd.extend(['--not', until_commit, f'--ancestry-path={until_commit}', '--boundary'])
         if first_parent:
             cmd.append('--first-parent')
+        if until_commit is None and not first_parent:
+            # plain reachability count can be answered from reachability bitmaps
+            # without walking the history, if the repository has them;
+            # if there are no bitmaps, Git silently falls back to the walk
+            cmd.append('--use-bitmap-index')
         process = subprocess.run(cmd, capture_output=True, check=True, encoding='utf8')
 
         return int(process.stdout)
 
-    def list_authors_shortlog(self, start_from=StartLogFrom.ALL):
-        """List all authors using git-shortlog
+    def collect_repo_summary(self, start_from=StartLogFrom.CURRENT):
+        """Count commits and find root commits, starting from `start_from`
 
-        Summarizes the history of the project by providing list of authors
-        together with their commit counts.  Uses `git shortlog --summary`
-        internally.
+        Gathers information equivalent to that from `count_commits` and
+        `find_roots` with the same `start_from`, but with a single walk
+        over the history (a single 'git rev-list --parents' invocation)
+        instead of two.
 
         :param start_from: where to start from to follow 'parent' links
         :type start_from: str or StartLogFrom
-        :return: list of authors together with their commit count,
+        :return: number of commits, and list of root commits
+        :rtype: RepoSummary
+        """
+        if hasattr(start_from, 'value'):
+            start_from = start_from.value
+        elif start_from is None:
+            start_from = 'HEAD'
+
+        cmd = [
+            *self._git_prefix,
+            'rev-list', '--parents',  # gives '<commit> SP <parent>...' lines
+            str(start_from),
+        ]
+        count = 0
+        roots = []
+        for line in self._iter_lines(cmd):
+            count += 1
+            if b' ' not in line:  # no parents
+                # SHA-1 is ASCII only
+                roots.append(line.decode('latin1'))
+
+        return RepoSummary(count, roots)
+
+    def iter_authors_shortlog(self, start_from=StartLogFrom.ALL):
+        """Iterate over all authors using git-shortlog
+
+        Like `list_authors_shortlog`, but returns generator instead of list;
+        each line is returned as text if it can be decoded, or as bytes
+        if it cannot.
+
+        :param start_from: where to start from to follow 'parent' links
+        :type start_from: str or StartLogFrom
+        :return: authors together with their commit count,
             in the 'SPACE* <count> TAB <author>' format
-        :rtype: list[str|bytes]
+        :rtype: typing.Iterator[str|bytes]
         """
         if hasattr(start_from, 'value'):
             start_from = start_from.value
         elif start_from is None:
             start_from = '--all'
         cmd = [
-            'git', '-C', self.repo,
+            *self._git_prefix,
             'shortlog',
             '--summary',  # Suppress commit description and provide a commit count summary only.
             '-n',  # Sort output according to the number of commits per author
             start_from,
         ]
-        process = subprocess.run(cmd, capture_output=True, check=True)
-        try:
-            # try to return text
-            return process.stdout.decode(GitRepo.log_encoding).splitlines()
-        except UnicodeDecodeError:
-            # if not possible, return bytes
-            return process.stdout.splitlines()
+        for line in self._iter_lines(cmd):
+            try:
+                # try to return text
+                yield line.decode(GitRepo.log_encoding)
+            except UnicodeDecodeError:
+                # if not possible, return bytes
+                yield line
+
+    def list_authors_shortlog(self, start_from=StartLogFrom.ALL):
+        """List all authors using git-shortlog
+
+        Summarizes the history of the project by providing list of authors
+        together with their commit counts.  Uses `git shortlog --summary`
+        internally.
+
+        :param start_from: where to start from to follow 'parent' links
+        :type start_from: str or StartLogFrom
+        :return: list of authors together with their commit count,
+            in the 'SPACE* <count> TAB <author>' format
+        :rtype: list[str|bytes]
+        """
+        return list(self.iter_authors_shortlog(start_from))
 
     def list_core_authors(self, start_from=StartLogFrom.ALL, perc=0.8):
         """List core authors using git-shortlog, and their fraction of commits
@@ -1333,13 +2134,16 @@ class GitRepo:
             perc
         )
 
-    def find_roots(self, start_from=StartLogFrom.CURRENT):
-        """Find root commits (commits without parents), starting from `start_from`
+    def iter_roots(self, start_from=StartLogFrom.CURRENT):
+        """Iterate over root commits (commits without parents), starting from `start_from`
+
+        Like `find_roots`, but returns generator instead of list; stopping
+        the iteration early stops walking the history.
 
         :param start_from: where to start from to follow 'parent' links
         :type start_from: str or StartLogFrom
-        :return: list of root commits, as SHA-1
-        :rtype: list[str]
+        :return: root commits, as SHA-1
+        :rtype: typing.Iterator[str]
         """
         if hasattr(start_from, 'value'):
             start_from = start_from.value
@@ -1347,12 +2151,35 @@ class GitRepo:
             start_from = 'HEAD'
 
         cmd = [
-            'git', '-C', self.repo,
+            *self._git_prefix,
             'rev-list', '--max-parents=0',  # gives all root commits
             str(start_from),
         ]
-        process = subprocess.run(cmd, capture_output=True, check=True, text=True)
-        return process.stdout.splitlines()
+        # SHA-1 is ASCII only
+        return (line.decode('latin1') for line in self._iter_lines(cmd))
+
+    def find_roots(self, start_from=StartLogFrom.CURRENT):
+        """Find root commits (commits without parents), starting from `start_from`
+
+        The result is cached (see `clear_cache`).
+
+        :param start_from: where to start from to follow 'parent' links
+        :type start_from: str or StartLogFrom
+        :return: list of root commits, as SHA-1
+        :rtype: list[str]
+        """
+        # return a copy, so that the caller can modify it
+        return list(self._find_roots(start_from))
+
+    @lru_cached_method(maxsize=256)
+    def _find_roots(self, start_from):
+        """Cached helper for `find_roots`, returns tuple of root commits
+
+        :param start_from: where to start from to follow 'parent' links
+        :type start_from: str or StartLogFrom
+        :rtype: tuple[str, ...]
+        """
+        return tuple(self.iter_roots(start_from))
 
     def get_config(self, name, value_type=None):
         """Query specific git config option
@@ -1370,7 +2197,7 @@ class GitRepo:
         :rtype: str or None
         """
         cmd = [
-            'git', '-C', self.repo,
+            *self._git_prefix,
             'config', str(name)
         ]
         if value_type is not None:
@@ -21,12 +21,11 @@ def strip_suffixes(s, suffixes):
     :rtype: str
     """
     # handle special case of a single suffix
-    if type(suffixes) == str:
-        suffixes = [suffixes]
+    if isinstance(suffixes, str):
+        suffixes = (suffixes,)
 
-    # process suffixes in order
+    # process suffixes in order; removing empty suffix is a no-op
     for suf in suffixes:
-        if s.endswith(suf):
-            s = s[:-len(suf)]
+        s = s.removesuffix(suf)
 
     return s